@@ -1,14 +1,16 @@
 # main.py
 
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import config
-from trading_strategy.data_fetcher import get_all_stock_data
+from trading_strategy.data_fetcher_async import get_all_stock_data
 from trading_strategy.backtester import Backtester
 from sheets_automation.sheets_logger import update_sheets
 
 # Import for bonus tasks
-from ml_model.predictor import train_and_predict
-from telegram_alerts.alerter import send_alert
+from ml_model.predictor import add_ml_indicators, create_ml_features, train_and_predict
+from telegram_alerts.alerter import send_alert, queue_alert, flush_alerts
 
 # Configure basic logging for the entire application
 logging.basicConfig(level=logging.INFO, 
@@ -21,6 +23,54 @@ logging.basicConfig(level=logging.INFO,
 
 logger = logging.getLogger(__name__)
 
+def _backtest_one(symbol: str, df) -> tuple:
+    """
+    Runs the trading strategy backtest for a single stock.
+    Defined at module level so it can be pickled into a worker process.
+
+    The RSI/MACD indicators are computed once here and shared: the backtester
+    reuses RSI_14, and the ML feature DataFrame is returned for Step 4.
+
+    Args:
+        symbol (str): The stock symbol being backtested.
+        df (pd.DataFrame): Historical OHLCV data for the symbol.
+
+    Returns:
+        tuple: (results, features_df) where results is the dict returned by
+               `Backtester.get_results` and features_df is the ML feature DataFrame,
+               or None if the data lacks the 'close' or 'volume' columns the ML step needs.
+    """
+    enriched_df = add_ml_indicators(df)
+    backtester = Backtester(symbol, enriched_df)
+    backtester.run_strategy()
+    # Step 4 skips (with a warning) symbols without close/volume, so don't fail the backtest over them
+    features_df = None
+    if 'close' in enriched_df.columns and 'volume' in enriched_df.columns:
+        features_df = create_ml_features(enriched_df)
+    return backtester.get_results(), features_df
+
+def _ml_one(symbol: str, df) -> tuple:
+    """
+    Trains the ML model for a single stock in a worker process.
+
+    Args:
+        symbol (str): The stock symbol.
+        df (pd.DataFrame): Historical OHLCV data for the symbol.
+
+    Returns:
+        tuple: (symbol, model, accuracy) where model and accuracy are None on failure.
+    """
+    model, accuracy = train_and_predict(df, symbol)
+    return symbol, model, accuracy
+
+def _max_workers(n_tasks: int) -> int:
+    """Returns a worker count bounded by both the number of tasks and available cores."""
+    return max(1, min(n_tasks, os.cpu_count() or 1))
+
+def _queue(message: str):
+    """Queues a Telegram alert using the configured bot token and chat ID."""
+    queue_alert(message, config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID)
+
 def run_algo_trading_system():
     """
     Main function to execute the algo trading system workflow:
@@ -40,29 +90,44 @@ def run_algo_trading_system():
         logger.error("Failed to fetch any stock data. Aborting system run.")
         send_alert("Algo Trading System: Failed to fetch stock data. Check API key and internet.", config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID) # Corrected
         return
-    logger.info(f"Successfully fetched data for {len(stock_data)} stock(s).")
+    logger.info("Successfully fetched data for %d stock(s).", len(stock_data))
     
     # --- 2. Run Trading Strategy & Backtest ---
     logger.info("Step 2: Running trading strategy backtests...")
     all_backtest_results = []
+    stock_features = {} # ML feature DataFrames computed alongside the backtests
+    backtest_inputs = {}
     for symbol, df in stock_data.items():
         if df.empty:
-            logger.warning(f"Skipping backtest for {symbol} as its DataFrame is empty.")
+            logger.warning("Skipping backtest for %s as its DataFrame is empty.", symbol)
             continue
-        
-        backtester = Backtester(symbol, df)
-        backtester.run_strategy()
-        results = backtester.get_results()
-        all_backtest_results.append(results)
-        logger.info(f"Backtest completed for {symbol}. Total P&L: {results['pnl']:.2f}")
-        
-        # Example of sending a Telegram alert for a significant trade or outcome
-        if results['total_trades'] > 0:
-            alert_msg = (f"Algo Trading System: Backtest for {symbol} completed.\n"
-                         f"Total P&L: {results['pnl']:.2f}\n"
-                         f"Win Ratio: {results['win_ratio']:.2f}%\n"
-                         f"Total Trades: {results['total_trades']}")
-            send_alert(alert_msg, config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID) # Corrected
+        backtest_inputs[symbol] = df
+
+    if backtest_inputs:
+        symbols = list(backtest_inputs)
+        backtest_outputs = {}
+        # Each symbol is independent and CPU-bound, so backtest them in separate processes.
+        # The numba kernels were already compiled (or loaded from numba's on-disk cache) when
+        # this process imported them, so the workers start without any JIT warm-up.
+        with ProcessPoolExecutor(max_workers=_max_workers(len(symbols))) as ex:
+            futures = {ex.submit(_backtest_one, symbol, backtest_inputs[symbol]): symbol for symbol in symbols}
+            for future in as_completed(futures):
+                backtest_outputs[futures[future]] = future.result()
+
+        # Report in the configured symbol order, whatever order the workers finished in
+        for symbol in symbols:
+            results, features_df = backtest_outputs[symbol]
+            all_backtest_results.append(results)
+            stock_features[symbol] = features_df
+            logger.info("Backtest completed for %s. Total P&L: %.2f", symbol, results['pnl'])
+
+            # Example of sending a Telegram alert for a significant trade or outcome
+            if results['total_trades'] > 0:
+                _queue(f"Algo Trading System: Backtest for {symbol} completed.\n"
+                       f"Total P&L: {results['pnl']:.2f}\n"
+                       f"Win Ratio: {results['win_ratio']:.2f}%\n"
+                       f"Total Trades: {results['total_trades']}")
+    flush_alerts()
 
     if not all_backtest_results:
         logger.warning("No backtest results generated for any stock. Skipping Google Sheets update.")
@@ -75,32 +140,50 @@ def run_algo_trading_system():
         # Pass Google Sheets config directly
         update_sheets(all_backtest_results, config.GOOGLE_SHEET_KEY_PATH, config.GOOGLE_SHEET_TITLE)
         logger.info("Google Sheets updated successfully.")
-        send_alert("Algo Trading System: Google Sheets updated successfully with backtest results.", config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID) # Corrected
+        _queue("Algo Trading System: Google Sheets updated successfully with backtest results.")
     except Exception as e:
-        logger.error(f"Error updating Google Sheets: {e}")
-        send_alert(f"Algo Trading System: Error updating Google Sheets: {e}", config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID) # Corrected
+        logger.error("Error updating Google Sheets: %s", e)
+        _queue(f"Algo Trading System: Error updating Google Sheets: {e}")
+    flush_alerts()
 
     # --- 4. ML Automation (Bonus) ---
     logger.info("Step 4 (Bonus): Running ML model for prediction...")
+    ml_inputs = {}
     for symbol, df in stock_data.items():
         if not df.empty and 'close' in df.columns and 'volume' in df.columns:
-            try:
-                logger.info(f"Training ML model for {symbol}...")
-                model, accuracy = train_and_predict(df)
-                if model is not None and accuracy is not None:
-                    logger.info(f"ML model for {symbol} trained with accuracy: {accuracy:.2f}")
-                    send_alert(f"ML model for {symbol} trained. Accuracy: {accuracy:.2f}", config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID) # Corrected
-                else:
-                    logger.warning(f"ML model training skipped or failed for {symbol}.")
-                    send_alert(f"ML model training skipped or failed for {symbol}.", config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID) # Corrected
-            except Exception as e:
-                logger.error(f"Error running ML model for {symbol}: {e}")
-                send_alert(f"Algo Trading System: Error running ML model for {symbol}: {e}", config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID) # Corrected
+            ml_inputs[symbol] = df
         else:
-            logger.warning(f"Skipping ML model for {symbol} due to insufficient data (missing 'close' or 'volume').")
+            logger.warning("Skipping ML model for %s due to insufficient data (missing 'close' or 'volume').", symbol)
+
+    if ml_inputs:
+        with ProcessPoolExecutor(max_workers=_max_workers(len(ml_inputs))) as ex:
+            futures = {}
+            for symbol, df in ml_inputs.items():
+                logger.info("Training ML model for %s...", symbol)
+                # Reuse the features computed during the backtest when available
+                ml_df = stock_features.get(symbol)
+                if ml_df is None or ml_df.empty:
+                    ml_df = df
+                futures[symbol] = ex.submit(_ml_one, symbol, ml_df)
+
+            # Report in the configured symbol order, whatever order the workers finished in
+            for symbol, future in futures.items():
+                try:
+                    _, model, accuracy = future.result()
+                    if model is not None and accuracy is not None:
+                        logger.info("ML model for %s trained with accuracy: %.2f", symbol, accuracy)
+                        _queue(f"ML model for {symbol} trained. Accuracy: {accuracy:.2f}")
+                    else:
+                        logger.warning("ML model training skipped or failed for %s.", symbol)
+                        _queue(f"ML model training skipped or failed for {symbol}.")
+                except Exception as e:
+                    logger.error("Error running ML model for %s: %s", symbol, e)
+                    _queue(f"Algo Trading System: Error running ML model for {symbol}: {e}")
+    flush_alerts()
 
     logger.info("--- Algo Trading System Finished ---")
-    send_alert("Algo Trading System: All processes completed.", config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID) # Corrected
+    _queue("Algo Trading System: All processes completed.")
+    flush_alerts()
 
 if __name__ == "__main__":
     # This block ensures the main function is called when the script is executed
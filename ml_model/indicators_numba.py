@@ -0,0 +1,92 @@
+# ml_model/indicators_numba.py
+
+import numpy as np
+from numba import njit
+from trading_strategy._njit import readonly_array as _ro
+
+# Explicit signatures compile the kernel eagerly at import time (loaded from numba's
+# on-disk cache on later runs), so the first call in each worker skips JIT compilation
+@njit([f"UniTuple(float64[:], 4)({_ro(t)})" for t in ("float32", "float64")], cache=True)
+def rsi_macd(close: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes RSI (14) and MACD (12, 26, 9) in a single pass over the close prices.
+
+    The results match pandas_ta's defaults: RSI uses Wilder's smoothing
+    (pandas `ewm(alpha=1/14, adjust=True)` over gains/losses, first value at index 14),
+    and each MACD EMA is seeded with the SMA of its first window.
+
+    Args:
+        close (np.ndarray): 1-D float32 or float64 array of close prices.
+                            Running sums are always kept in float64.
+
+    Returns:
+        tuple[np.ndarray, ...]: (rsi, macd, signal, histogram), each the same length
+                                as `close` with NaN where the indicator is undefined.
+    """
+    n = close.size
+    rsi = np.full(n, np.nan)
+    macd = np.full(n, np.nan)
+    signal = np.full(n, np.nan)
+    hist = np.full(n, np.nan)
+
+    rsi_length, fast_length, slow_length, signal_length = 14, 12, 26, 9
+    rsi_decay = 1.0 - 1.0 / rsi_length
+    a_fast = 2.0 / (fast_length + 1)
+    a_slow = 2.0 / (slow_length + 1)
+    a_signal = 2.0 / (signal_length + 1)
+
+    # RSI state: decayed sums of gains/losses and of the weights (adjust=True EWM)
+    gain_sum = 0.0
+    loss_sum = 0.0
+    weight_sum = 0.0
+    # EMA state: running sums seed each EMA with an SMA of its first window
+    fast = 0.0
+    slow = 0.0
+    sig = 0.0
+
+    for i in range(n):
+        c = close[i]
+
+        # --- RSI ---
+        if i > 0:
+            diff = c - close[i - 1]
+            gain_sum = (diff if diff > 0.0 else 0.0) + rsi_decay * gain_sum
+            loss_sum = (-diff if diff < 0.0 else 0.0) + rsi_decay * loss_sum
+            weight_sum = 1.0 + rsi_decay * weight_sum
+            if i >= rsi_length:
+                avg_gain = gain_sum / weight_sum
+                avg_loss = loss_sum / weight_sum
+                if avg_gain + avg_loss != 0.0:
+                    rsi[i] = 100.0 * avg_gain / (avg_gain + avg_loss)
+
+        # --- Fast and slow EMAs ---
+        if i < fast_length:
+            fast += c
+            if i == fast_length - 1:
+                fast /= fast_length
+        else:
+            fast = a_fast * c + (1.0 - a_fast) * fast
+
+        if i < slow_length:
+            slow += c
+            if i == slow_length - 1:
+                slow /= slow_length
+        else:
+            slow = a_slow * c + (1.0 - a_slow) * slow
+
+        # --- MACD line, signal and histogram ---
+        if i >= slow_length - 1:
+            m = fast - slow
+            macd[i] = m
+            k = i - (slow_length - 1) # Position within the valid MACD series
+            if k < signal_length:
+                sig += m
+                if k == signal_length - 1:
+                    sig /= signal_length
+            else:
+                sig = a_signal * m + (1.0 - a_signal) * sig
+            if k >= signal_length - 1:
+                signal[i] = sig
+                hist[i] = m - sig
+
+    return rsi, macd, signal, hist
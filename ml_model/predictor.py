@@ -1,62 +1,177 @@
 # ml_model/predictor.py
 
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
 from sklearn.tree import DecisionTreeClassifier # Or LogisticRegression
 from sklearn.metrics import accuracy_score, classification_report
-import pandas_ta as ta # For MACD and other indicators
+import joblib
+import hashlib
+import os
 import logging
+from .indicators_numba import rsi_macd
+from .tree_compiler import CompiledTree
 
 logger = logging.getLogger(__name__)
 
+# On-disk cache of trained models: one file per symbol, holding the model together with
+# a fingerprint of the training data and estimator it was trained from
+MODEL_CACHE_DIR = ".cache/ml"
+
+# Depth cap for the decision tree. An unbounded tree memorises the training days,
+# is slow to fit on long histories and needs many branches per prediction.
+MAX_TREE_DEPTH = 4
+
+def _new_model() -> DecisionTreeClassifier:
+    """
+    Returns the (unfitted) estimator used by `train_and_predict`.
+    """
+    return DecisionTreeClassifier(max_depth=MAX_TREE_DEPTH, random_state=42)
+
+def _fingerprint(X: pd.DataFrame, y: pd.Series, model) -> str:
+    """
+    Returns a hex digest identifying the training data and estimator configuration.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(model).encode())
+    h.update(f"{X.index[-1]}|{len(X)}".encode())
+    h.update(np.ascontiguousarray(X.to_numpy(dtype=np.float64)).tobytes())
+    h.update(np.ascontiguousarray(y.to_numpy(dtype=np.int8)).tobytes())
+    return h.hexdigest()
+
+def _as_float_array(series: pd.Series) -> np.ndarray:
+    """
+    Returns the Series values as a float array, keeping float32 or float64 data as-is
+    and converting anything else (e.g. integer volumes) to float64.
+    """
+    values = series.to_numpy()
+    if values.dtype != np.float32 and values.dtype != np.float64:
+        values = values.astype(np.float64)
+    return values
+
+def _compute_rsi_macd(df: pd.DataFrame) -> tuple:
+    """
+    Returns (rsi, macd, signal, hist) for the DataFrame's close prices.
+    The jitted kernel takes a few microseconds, so it is cheaper to rerun than to cache.
+    """
+    # The kernel only needs float32 precision; the frame's prices stay float64
+    return rsi_macd(df['close'].to_numpy(dtype=np.float32))
+
+def add_ml_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Appends the indicator columns used as ML features (RSI_14 and the MACD components)
+    to a copy of the DataFrame, without dropping any rows.
+
+    This is computed once per symbol so the same enriched DataFrame can be shared
+    by the backtester (which reuses RSI_14) and `create_ml_features`.
+
+    Args:
+        df (pd.DataFrame): DataFrame with 'close' prices.
+
+    Returns:
+        pd.DataFrame: A copy of the DataFrame with the indicator columns added.
+    """
+    df_copy = df.copy()
+
+    # Only compute indicators that are not already present
+    if 'RSI_14' in df_copy.columns and 'MACD_12_26_9' in df_copy.columns:
+        return df_copy
+
+    # Single jitted pass producing RSI_14 and MACD_12_26_9 / MACDh_12_26_9 / MACDs_12_26_9
+    rsi, macd, signal, hist = _compute_rsi_macd(df_copy)
+    df_copy['RSI_14'] = rsi
+    df_copy['MACD_12_26_9'] = macd
+    df_copy['MACDh_12_26_9'] = hist
+    df_copy['MACDs_12_26_9'] = signal
+
+    return df_copy
+
 def create_ml_features(df: pd.DataFrame) -> pd.DataFrame:
     """
     Creates features for the ML model from the stock data.
     Features include RSI, MACD components, Volume, and the target variable.
+    Indicator columns already present (see `add_ml_indicators`) are reused.
+
+    The result is built as a new DataFrame from NumPy arrays rather than a copy
+    of the input, so only the feature columns are allocated.
 
     Args:
         df (pd.DataFrame): DataFrame with 'close' prices and 'volume'.
 
     Returns:
-        pd.DataFrame: DataFrame with added features and the 'next_day_movement' target.
+        pd.DataFrame: DataFrame with the 'close' price, the feature columns
+                      and the 'next_day_movement' target.
     """
     if not isinstance(df, pd.DataFrame) or df.empty:
         logger.error("Input DataFrame is invalid or empty for ML feature creation.")
         return pd.DataFrame()
 
-    df_copy = df.copy()
+    missing_columns = [col for col in ('close', 'volume') if col not in df.columns]
+    if missing_columns:
+        logger.error("Missing required columns for ML feature creation: %s", missing_columns)
+        return pd.DataFrame()
 
-    # Calculate next day movement as target variable (1 if price goes up, 0 if down/same)
-    df_copy['next_day_movement'] = (df_copy['close'].shift(-1) > df_copy['close']).astype(int)
+    close = _as_float_array(df['close'])
+    volume = _as_float_array(df['volume'])
 
     # Add technical indicators as features
-    df_copy.ta.rsi(append=True) # RSI_14
-    df_copy.ta.macd(append=True) # MACD_12_26_9, MACDh_12_26_9, MACDs_12_26_9
+    if 'RSI_14' in df.columns and 'MACD_12_26_9' in df.columns:
+        rsi = df['RSI_14'].to_numpy(dtype=np.float64)
+        macd = df['MACD_12_26_9'].to_numpy(dtype=np.float64)
+        hist = df['MACDh_12_26_9'].to_numpy(dtype=np.float64)
+        signal = df['MACDs_12_26_9'].to_numpy(dtype=np.float64)
+    else:
+        rsi, macd, signal, hist = _compute_rsi_macd(df)
 
-    # Drop rows with NaN values that result from indicator calculations or shift operations
+    # Calculate next day movement as target variable (1 if price goes up, 0 if down/same)
+    next_day_movement = np.zeros(close.size, dtype=np.int8)
+    next_day_movement[:-1] = close[1:] > close[:-1]
+
+    # Keep only rows where every feature is defined
     # This is crucial as ML models cannot handle NaNs
-    df_copy.dropna(inplace=True)
+    valid = ~(np.isnan(rsi) | np.isnan(macd) | np.isnan(signal) | np.isnan(hist) | np.isnan(volume))
+
+    features_df = pd.DataFrame({
+        'close': close[valid],
+        'volume': volume[valid],
+        'RSI_14': rsi[valid],
+        'MACD_12_26_9': macd[valid],
+        'MACDh_12_26_9': hist[valid],
+        'MACDs_12_26_9': signal[valid],
+        'next_day_movement': next_day_movement[valid]
+    }, index=df.index[valid])
     
-    if df_copy.empty:
+    if features_df.empty:
         logger.warning("DataFrame became empty after creating features and dropping NaNs.")
 
-    return df_copy
+    return features_df
 
-def train_and_predict(data: pd.DataFrame) -> tuple[any, float] | tuple[None, None]:
+def train_and_predict(data: pd.DataFrame, symbol: str | None = None) -> tuple[CompiledTree, float] | tuple[None, None]:
     """
-    Trains a simple Decision Tree model to predict next-day movement
-    and evaluates its accuracy.
+    Trains a shallow Decision Tree model to predict next-day movement
+    and evaluates its accuracy. The fitted tree is returned compiled to a
+    plain Python function (see `CompiledTree`) for fast per-bar prediction;
+    the sklearn estimator remains available as `.model`.
+
+    When a symbol is given, the result is persisted under `MODEL_CACHE_DIR` and
+    reused on later runs with identical training data instead of refitting.
+    Each symbol keeps a single cache file, overwritten whenever the model is retrained.
 
     Args:
-        data (pd.DataFrame): DataFrame containing historical stock data with 'close' and 'volume'.
+        data (pd.DataFrame): DataFrame containing historical stock data with 'close' and 'volume',
+                             or a DataFrame already returned by `create_ml_features`.
+        symbol (str | None): The stock symbol. When given, trained models are cached on disk.
 
     Returns:
-        tuple[any, float] | tuple[None, None]: A tuple containing the trained model and its accuracy,
+        tuple[CompiledTree, float] | tuple[None, None]: A tuple containing the compiled model and its accuracy,
                                                or (None, None) if training fails.
     """
     logger.info("Starting ML model training and prediction...")
     
-    processed_df = create_ml_features(data)
+    # Skip feature creation if the caller passed an already-featured DataFrame
+    if 'next_day_movement' in data.columns and 'RSI_14' in data.columns:
+        processed_df = data
+    else:
+        processed_df = create_ml_features(data)
     
     if processed_df.empty:
         logger.error("Cannot train ML model: Processed data is empty.")
@@ -70,47 +185,69 @@ def train_and_predict(data: pd.DataFrame) -> tuple[any, float] | tuple[None, Non
     # Check if all required features exist in the DataFrame
     missing_features = [f for f in features if f not in processed_df.columns]
     if missing_features:
-        logger.error(f"Missing required features for ML training: {missing_features}")
+        logger.error("Missing required features for ML training: %s", missing_features)
         return None, None
 
     X = processed_df[features]
     y = processed_df[target]
 
-    # Split data into training and testing sets
-    # Use stratify=y to maintain the same proportion of target classes in both sets
-    if len(X) < 2: # Need at least 2 samples for train_test_split
-        logger.warning(f"Not enough data points ({len(X)}) for ML training after feature creation. Skipping ML for this stock.")
+    # Split data chronologically into training and testing sets
+    # (no shuffling: the model must be evaluated on days after the ones it was trained on)
+    if len(X) < 2: # Need at least 2 samples to form a train and a test set
+        logger.warning("Not enough data points (%d) for ML training after feature creation. Skipping ML for this stock.", len(X))
         return None, None
 
-    # Handle cases where a class might have only one sample (stratify would fail)
-    if y.nunique() < 2:
-        logger.warning("Target variable has only one class. Skipping stratified split.")
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    else:
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    split_idx = int(len(X) * 0.8)
+    X_train, X_test = X.iloc[:split_idx].to_numpy(), X.iloc[split_idx:].to_numpy()
+    y_train, y_test = y.iloc[:split_idx].to_numpy(), y.iloc[split_idx:].to_numpy()
     
-    if X_train.empty or X_test.empty:
+    if len(X_train) == 0 or len(X_test) == 0:
         logger.warning("Training or testing set is empty. Skipping ML model.")
         return None, None
 
+    model = _new_model()
+
+    # Reuse a previously trained model if the data and estimator are unchanged
+    cache_path = None
+    if symbol is not None:
+        cache_path = os.path.join(MODEL_CACHE_DIR, f"{symbol}.joblib")
+        fingerprint = _fingerprint(X, y, model)
+        if os.path.exists(cache_path):
+            try:
+                cached_fingerprint, compiled_model, accuracy = joblib.load(cache_path)
+                if cached_fingerprint == fingerprint:
+                    logger.info("Loaded cached ML model for %s. Accuracy: %.4f", symbol, accuracy)
+                    return compiled_model, accuracy
+            except Exception as e:
+                logger.warning("Could not load cached ML model from %s: %s. Retraining.", cache_path, e)
+
     try:
-        # Initialize and train the Decision Tree Classifier model
-        model = DecisionTreeClassifier(random_state=42)
+        # Train the Decision Tree Classifier model
         model.fit(X_train, y_train)
         
-        # Make predictions on the test set
-        predictions = model.predict(X_test)
+        compiled_model = CompiledTree(model)
+
+        # Make predictions on the test set with the vectorized level-by-level traversal
+        predictions = compiled_model.predict(X_test)
         
         # Calculate accuracy
         accuracy = accuracy_score(y_test, predictions)
         
-        logger.info(f"ML Model Training Complete. Accuracy: {accuracy:.4f}")
-        logger.debug(f"Classification Report:\n{classification_report(y_test, predictions)}")
+        logger.info("ML Model Training Complete. Accuracy: %.4f", accuracy)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Classification Report:\n%s", classification_report(y_test, predictions))
+
+        if cache_path is not None:
+            try:
+                os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+                joblib.dump((fingerprint, compiled_model, accuracy), cache_path, compress=3)
+            except Exception as e:
+                logger.warning("Could not cache ML model to %s: %s", cache_path, e)
         
-        return model, accuracy
+        return compiled_model, accuracy
     
     except Exception as e:
-        logger.error(f"Error during ML model training or prediction: {e}")
+        logger.error("Error during ML model training or prediction: %s", e)
         return None, None
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+# ml_model/tree_compiler.py
+
+import numpy as np
+import logging
+from sklearn.tree import DecisionTreeClassifier
+
+logger = logging.getLogger(__name__)
+
+# CPython limits source indentation to 100 levels; deeper trees fall back to sklearn
+MAX_COMPILED_DEPTH = 90
+
+def tree_to_source(model: DecisionTreeClassifier, func_name: str = "predict_one") -> str:
+    """
+    Generates the source of a straight-line Python function equivalent to
+    `model.predict` for a single sample, as nested if/else statements.
+    The generated code refers to NumPy as `np`.
+
+    Args:
+        model (DecisionTreeClassifier): A fitted decision tree.
+        func_name (str): The name of the generated function.
+
+    Returns:
+        str: Python source defining `func_name(x)`, where `x` is a sequence of feature values.
+    """
+    tree = model.tree_
+    lines = [f"def {func_name}(x):",
+             # sklearn evaluates splits on float32 inputs; do the same so results match exactly
+             "    x = np.asarray(x, dtype=np.float32)"]
+
+    def emit(node: int, depth: int):
+        indent = "    " * depth
+        left, right = tree.children_left[node], tree.children_right[node]
+        if left == right: # Leaf node (both children are -1)
+            label = model.classes_[int(np.argmax(tree.value[node][0]))]
+            if isinstance(label, np.generic):
+                label = label.item()
+            lines.append(f"{indent}return {label!r}")
+            return
+        # sklearn sends samples with x[feature] <= threshold to the left child
+        lines.append(f"{indent}if x[{int(tree.feature[node])}] <= {repr(float(tree.threshold[node]))}:")
+        emit(left, depth + 1)
+        lines.append(f"{indent}else:")
+        emit(right, depth + 1)
+
+    emit(0, 1)
+    return "\n".join(lines) + "\n"
+
+def predict_batch(model: DecisionTreeClassifier, X: np.ndarray) -> np.ndarray:
+    """
+    Predicts classes for many samples at once by advancing every sample one tree
+    level per step with vectorized NumPy comparisons, instead of walking the tree
+    sample by sample.
+
+    Args:
+        model (DecisionTreeClassifier): A fitted decision tree.
+        X (np.ndarray): 2-D array of shape (n_samples, n_features).
+
+    Returns:
+        np.ndarray: The predicted class labels, identical to `model.predict(X)`.
+    """
+    tree = model.tree_
+    # sklearn evaluates splits on float32 inputs; do the same so results match exactly
+    X = np.asarray(X, dtype=np.float32)
+    left, right = tree.children_left, tree.children_right
+    is_leaf = left == right
+    # Leaves keep pointing at themselves so finished samples stay put
+    left = np.where(is_leaf, np.arange(tree.node_count), left)
+    right = np.where(is_leaf, np.arange(tree.node_count), right)
+    feature = np.where(is_leaf, 0, tree.feature)
+
+    rows = np.arange(X.shape[0])
+    node = np.zeros(X.shape[0], dtype=np.intp)
+    for _ in range(tree.max_depth):
+        go_left = X[rows, feature[node]] <= tree.threshold[node]
+        node = np.where(go_left, left[node], right[node])
+
+    leaf_class = model.classes_[np.argmax(tree.value[:, 0, :], axis=1)]
+    return leaf_class[node]
+
+def _compile_source(source: str, func_name: str = "predict_one"):
+    namespace = {"np": np}
+    exec(compile(source, "<compiled_tree>", "exec"), namespace)
+    return namespace[func_name]
+
+class CompiledTree:
+    """
+    A fitted DecisionTreeClassifier compiled to a plain Python function for
+    low-latency single-sample prediction (e.g. one call per new bar).
+
+    The generated source is kept rather than the function itself, so instances
+    can be pickled (e.g. returned from a worker process); it is regenerated and
+    recompiled on load.
+    """
+    def __init__(self, model: DecisionTreeClassifier):
+        """
+        Args:
+            model (DecisionTreeClassifier): A fitted decision tree.
+        """
+        self.model = model
+        if model.get_depth() <= MAX_COMPILED_DEPTH:
+            self.source = tree_to_source(model)
+        else:
+            logger.warning("Tree depth %d is too deep to compile. Falling back to sklearn predict.", model.get_depth())
+            self.source = None
+        self._predict_one = self._build()
+
+    def _build(self):
+        if self.source is None:
+            return self._predict_with_model
+        return _compile_source(self.source)
+
+    def _predict_with_model(self, x):
+        return self.model.predict(np.asarray(x, dtype=np.float64).reshape(1, -1))[0]
+
+    def __call__(self, x):
+        """
+        Predicts the class for a single sample.
+
+        Args:
+            x (Sequence[float]): Feature values in training column order.
+
+        Returns:
+            The predicted class label.
+        """
+        return self._predict_one(x)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predicts classes for a batch of samples (see `predict_batch`).
+
+        Args:
+            X (np.ndarray): 2-D array of shape (n_samples, n_features).
+
+        Returns:
+            np.ndarray: The predicted class labels.
+        """
+        return predict_batch(self.model, X)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_predict_one']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.source is not None:
+            # Regenerate rather than trust the pickled source, so cached models pick up compiler fixes
+            self.source = tree_to_source(self.model)
+        self._predict_one = self._build()
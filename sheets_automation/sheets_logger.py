@@ -2,11 +2,30 @@
 
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
+import numpy as np
 import pandas as pd
 import logging
+import os
+import functools
 
 logger = logging.getLogger(__name__)
 
+# Scope for Google Sheets and Drive APIs
+SCOPE = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+
+@functools.lru_cache(maxsize=4)
+def _get_client(key_path: str, mtime: float) -> gspread.Client:
+    """
+    Returns an authorized gspread client, reused across calls so the OAuth2 token
+    exchange happens once. `mtime` is part of the cache key so that replacing
+    the key file yields a fresh client.
+    """
+    # Load credentials from the JSON key file
+    creds = ServiceAccountCredentials.from_json_keyfile_name(key_path, SCOPE)
+    
+    # Authorize the gspread client with the loaded credentials
+    return gspread.authorize(creds)
+
 def connect_to_sheets(key_path: str, sheet_title: str) -> gspread.Spreadsheet | None:
     """
     Connects to Google Sheets using a service account.
@@ -20,14 +39,8 @@ def connect_to_sheets(key_path: str, sheet_title: str) -> gspread.Spreadsheet |
                                     otherwise None.
     """
     try:
-        # Define the scope for Google Sheets and Drive APIs
-        scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-        
-        # Load credentials from the JSON key file
-        creds = ServiceAccountCredentials.from_json_keyfile_name(key_path, scope)
-        
-        # Authorize the gspread client with the loaded credentials
-        client = gspread.authorize(creds)
+        # Get the (cached) authorized client for this key file
+        client = _get_client(key_path, os.path.getmtime(key_path))
         
         # Open the spreadsheet by its title
         spreadsheet = client.open(sheet_title)
@@ -40,6 +53,30 @@ def connect_to_sheets(key_path: str, sheet_title: str) -> gspread.Spreadsheet |
         logger.error(f"Error connecting to Google Sheets: {e}. Check credentials and sheet permissions.")
         return None
 
+def _to_cell(value):
+    """
+    Converts a trade log value into a JSON-serializable cell value,
+    writing timestamps as ISO-8601 strings and NumPy scalars as Python numbers.
+    """
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def _two_decimal_format_request(sheet_id: int, column_index: int = 1) -> dict:
+    """
+    Builds a Sheets API `repeatCell` request that displays a column's data rows
+    (everything below the header) with 2 decimal places.
+    """
+    return {
+        "repeatCell": {
+            "range": {"sheetId": sheet_id, "startRowIndex": 1, "startColumnIndex": column_index, "endColumnIndex": column_index + 1},
+            "cell": {"userEnteredFormat": {"numberFormat": {"type": "NUMBER", "pattern": "0.00"}}},
+            "fields": "userEnteredFormat.numberFormat"
+        }
+    }
+
 def update_sheets(results_data: list[dict], key_path: str, sheet_title: str):
     """
     Updates the Google Sheet with trade logs, P&L summary, and win ratio.
@@ -65,10 +102,7 @@ def update_sheets(results_data: list[dict], key_path: str, sheet_title: str):
     # Helper function to get or create a worksheet
     def get_or_create_worksheet(ws_name: str) -> gspread.Worksheet:
         try:
-            worksheet = spreadsheet.worksheet(ws_name)
-            worksheet.clear() # Clear existing content for fresh update
-            logger.info(f"Cleared existing data in worksheet: '{ws_name}'")
-            return worksheet
+            return spreadsheet.worksheet(ws_name)
         except gspread.WorksheetNotFound:
             logger.info(f"Worksheet '{ws_name}' not found. Creating it...")
             worksheet = spreadsheet.add_worksheet(ws_name, rows=1, cols=1)
@@ -79,67 +113,72 @@ def update_sheets(results_data: list[dict], key_path: str, sheet_title: str):
             raise # Re-raise to stop execution if a critical error occurs
 
     try:
-        trade_log_sheet = get_or_create_worksheet(trade_log_ws_name)
+        get_or_create_worksheet(trade_log_ws_name)
         pnl_summary_sheet = get_or_create_worksheet(pnl_summary_ws_name)
         win_ratio_sheet = get_or_create_worksheet(win_ratio_ws_name)
 
         # --- Log Trade Details ---
-        # Concatenate all trade logs into a single DataFrame
-        all_trade_logs = []
+        # Build the nested list straight from each per-symbol trade log instead of
+        # concatenating them into one DataFrame first
+        trade_log_data = None
+        trade_count = 0
         for res in results_data:
-            if not res['trade_log'].empty:
-                all_trade_logs.append(res['trade_log'])
-        
-        if all_trade_logs:
-            trade_log_df = pd.concat(all_trade_logs, ignore_index=True)
-            # Convert DataFrame to list of lists for gspread update
-            # First row is headers, subsequent rows are data
-            trade_log_data = [trade_log_df.columns.values.tolist()] + trade_log_df.values.tolist()
-            trade_log_sheet.update(trade_log_data)
-            logger.info(f"Updated '{trade_log_ws_name}' with {len(trade_log_df)} trade entries.")
+            trade_log = res['trade_log']
+            if trade_log.empty:
+                continue
+            if trade_log_data is None:
+                # First row is headers, subsequent rows are data
+                trade_log_data = [trade_log.columns.tolist()]
+            for row in trade_log.itertuples(index=False, name=None):
+                trade_log_data.append([_to_cell(value) for value in row])
+            trade_count += len(trade_log)
+
+        if trade_log_data is not None:
+            logger.info(f"Prepared {trade_count} trade entries for '{trade_log_ws_name}'.")
         else:
             logger.info(f"No trade logs to update in '{trade_log_ws_name}'.")
             # Still update headers if no data
-            trade_log_sheet.update([['symbol', 'buy_date', 'buy_price', 'sell_date', 'sell_price', 'pnl', 'status']])
+            trade_log_data = [['symbol', 'buy_date', 'buy_price', 'sell_date', 'sell_price', 'pnl', 'status']]
 
 
         # --- Log P&L Summary ---
-        pnl_summary_list = []
-        for res in results_data:
-            pnl_summary_list.append({
-                'Symbol': res['symbol'],
-                'Total P&L': res['pnl'],
-                'Total Trades': res['total_trades']
-            })
-        pnl_summary_df = pd.DataFrame(pnl_summary_list)
-        
-        if not pnl_summary_df.empty:
-            pnl_summary_data = [pnl_summary_df.columns.values.tolist()] + pnl_summary_df.values.tolist()
-            pnl_summary_sheet.update(pnl_summary_data)
-            logger.info(f"Updated '{pnl_summary_ws_name}' with P&L summary.")
-        else:
+        # Built directly as rows; values are cast to Python numbers so NumPy scalars
+        # (e.g. numpy.float64 P&L) serialize cleanly
+        pnl_summary_data = [['Symbol', 'Total P&L', 'Total Trades']]
+        pnl_summary_data.extend([res['symbol'], float(res['pnl']), int(res['total_trades'])] for res in results_data)
+        if len(pnl_summary_data) == 1:
             logger.info(f"No P&L summary data to update in '{pnl_summary_ws_name}'.")
-            pnl_summary_sheet.update([['Symbol', 'Total P&L', 'Total Trades']])
 
 
         # --- Log Win Ratio ---
-        win_ratio_list = []
-        for res in results_data:
-            win_ratio_list.append({
-                'Symbol': res['symbol'],
-                'Win Ratio (%)': f"{res['win_ratio']:.2f}", # Format as string with 2 decimal places
-                'Wins': res['win_count'],
-                'Losses': res['loss_count']
-            })
-        win_ratio_df = pd.DataFrame(win_ratio_list)
-
-        if not win_ratio_df.empty:
-            win_ratio_data = [win_ratio_df.columns.values.tolist()] + win_ratio_df.values.tolist()
-            win_ratio_sheet.update(win_ratio_data)
-            logger.info(f"Updated '{win_ratio_ws_name}' with win ratio summary.")
-        else:
+        # Raw numbers are written; the 2-decimal display comes from the number format below
+        win_ratio_data = [['Symbol', 'Win Ratio (%)', 'Wins', 'Losses']]
+        win_ratio_data.extend([res['symbol'], float(res['win_ratio']), int(res['win_count']), int(res['loss_count'])]
+                              for res in results_data)
+        if len(win_ratio_data) == 1:
             logger.info(f"No win ratio data to update in '{win_ratio_ws_name}'.")
-            win_ratio_sheet.update([['Symbol', 'Win Ratio (%)', 'Wins', 'Losses']])
+
+        # --- Write all worksheets ---
+        # One batch clear and one batch update instead of a clear + update per worksheet.
+        # Sheet names are quoted in A1 notation since they contain spaces and '&'.
+        ranges = {ws_name: f"'{ws_name}'" for ws_name in (trade_log_ws_name, pnl_summary_ws_name, win_ratio_ws_name)}
+        spreadsheet.values_batch_clear(body={"ranges": list(ranges.values())})
+        logger.info("Cleared existing data in all report worksheets.")
+
+        spreadsheet.values_batch_update({
+            "valueInputOption": "USER_ENTERED",
+            "data": [
+                {"range": f"{ranges[trade_log_ws_name]}!A1", "values": trade_log_data},
+                {"range": f"{ranges[pnl_summary_ws_name]}!A1", "values": pnl_summary_data},
+                {"range": f"{ranges[win_ratio_ws_name]}!A1", "values": win_ratio_data},
+            ]
+        })
+        logger.info(f"Updated '{trade_log_ws_name}', '{pnl_summary_ws_name}' and '{win_ratio_ws_name}'.")
+
+        # Show 'Total P&L' and 'Win Ratio (%)' (column B, below the header) with 2 decimals
+        spreadsheet.batch_update({
+            "requests": [_two_decimal_format_request(sheet.id) for sheet in (pnl_summary_sheet, win_ratio_sheet)]
+        })
 
         logger.info("All Google Sheets updated successfully.")
 
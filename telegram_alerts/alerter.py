@@ -1,14 +1,44 @@
 # telegram_alerts/alerter.py
 
-import telegram
+import httpx
 import logging
 import asyncio # New: Import the asyncio library
+import atexit
 
 logger = logging.getLogger(__name__)
 
-def send_alert(message: str, bot_token: str, chat_id: str):
+TELEGRAM_API_URL = "https://api.telegram.org/bot{token}/sendMessage"
+
+# Shared HTTP/2 client so the TLS connection to api.telegram.org is reused across alerts.
+# It is only ever driven from _loop, which keeps its connection pool valid between calls.
+_client = httpx.AsyncClient(http2=True, timeout=5.0)
+_loop = None
+_pending_alerts = [] # Alerts queued with queue_alert(), sent by flush_alerts()
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the persistent event loop used to run alert coroutines.
+    """
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop
+
+def _close_client():
+    """
+    Closes the shared HTTP client and event loop at interpreter exit.
+    """
+    loop = _get_loop()
+    loop.run_until_complete(_client.aclose())
+    loop.close()
+
+atexit.register(_close_client)
+
+async def send_alert_async(message: str, bot_token: str, chat_id: str):
     """
-    Sends a message to a predefined Telegram chat using the configured bot.
+    Sends a message to a predefined Telegram chat via the Bot API `sendMessage` method.
+    Errors are logged rather than raised so that one failed alert does not
+    cancel the others in a batch.
 
     Args:
         message (str): The text message to send.
@@ -18,23 +48,59 @@ def send_alert(message: str, bot_token: str, chat_id: str):
     if not bot_token or not chat_id:
         logger.warning("Telegram bot token or chat ID is not configured. Skipping alert.")
         return
-        
+
     try:
-        # Initialize the bot with your token
-        bot = telegram.Bot(token=bot_token)
-        
-        # Use asyncio to properly run the asynchronous send_message function
-        async def _send_message_async():
-            await bot.send_message(chat_id=chat_id, text=message)
-
-        asyncio.run(_send_message_async())
-        
-        logger.info("Telegram alert sent successfully.")
-    except telegram.error.InvalidToken:
-        logger.error("Invalid Telegram Bot Token. Please check your config.py.")
-    except telegram.error.Unauthorized:
-        logger.error("Unauthorized: Bot token is incorrect or bot cannot access the chat. Check chat ID and bot permissions.")
-    except telegram.error.NetworkError as e:
+        response = await _client.post(TELEGRAM_API_URL.format(token=bot_token),
+                                      json={"chat_id": chat_id, "text": message})
+
+        if response.status_code == 401 or response.status_code == 404:
+            # The Bot API answers 404 for malformed tokens and 401 for revoked ones
+            logger.error("Invalid Telegram Bot Token. Please check your config.py.")
+        elif response.status_code == 403:
+            logger.error("Unauthorized: Bot token is incorrect or bot cannot access the chat. Check chat ID and bot permissions.")
+        elif response.status_code != 200:
+            logger.error(f"Telegram API error ({response.status_code}) while sending alert: {response.text[:200]}")
+        else:
+            logger.info("Telegram alert sent successfully.")
+    except httpx.RequestError as e:
         logger.error(f"Network error while sending Telegram alert: {e}")
     except Exception as e:
         logger.error(f"An unexpected error occurred while sending Telegram alert: {e}")
+
+def send_alert(message: str, bot_token: str, chat_id: str):
+    """
+    Sends a single message immediately, reusing the shared client and event loop.
+
+    Args:
+        message (str): The text message to send.
+        bot_token (str): The Telegram Bot API token.
+        chat_id (str): The numerical chat ID.
+    """
+    _get_loop().run_until_complete(send_alert_async(message, bot_token, chat_id))
+
+def queue_alert(message: str, bot_token: str, chat_id: str):
+    """
+    Queues a message to be sent on the next call to `flush_alerts`.
+
+    Args:
+        message (str): The text message to send.
+        bot_token (str): The Telegram Bot API token.
+        chat_id (str): The numerical chat ID.
+    """
+    _pending_alerts.append((message, bot_token, chat_id))
+
+def flush_alerts():
+    """
+    Sends all queued alerts concurrently in a single event loop run.
+    """
+    if not _pending_alerts:
+        return
+
+    batch = list(_pending_alerts)
+    _pending_alerts.clear()
+
+    async def _send_batch_async():
+        await asyncio.gather(*[send_alert_async(*alert) for alert in batch])
+
+    _get_loop().run_until_complete(_send_batch_async())
+    logger.info(f"Flushed {len(batch)} queued Telegram alert(s).")
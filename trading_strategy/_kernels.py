@@ -0,0 +1,108 @@
+# trading_strategy/_kernels.py
+
+import numpy as np
+from ._njit import njit, prange, readonly_array as _ro
+
+# Explicit signatures make numba compile the serial kernels eagerly at import time (and load them
+# from its on-disk cache on later runs), so the first call never pays for JIT compilation.
+# Close prices may be float32 (as passed by add_indicators) or float64; outputs are always float64.
+# Input arrays are declared with `readonly_array`, so column slices of 2-D arrays are accepted too.
+_CLOSE_TYPES = ("float32", "float64")
+
+@njit([f"void({_ro(t)}, int64, int64, float64[:], float64[:])" for t in _CLOSE_TYPES], cache=True)
+def sma_pair(close: np.ndarray, n_fast: int, n_slow: int, out_fast: np.ndarray, out_slow: np.ndarray):
+    """
+    Writes two simple moving averages of `close` (e.g. the 20- and 50-day) in one pass,
+    keeping a rolling sum for each window so `close` is only streamed once.
+
+    Args:
+        close (np.ndarray): 1-D float32 or float64 array of close prices.
+        n_fast (int): The shorter window length.
+        n_slow (int): The longer window length.
+        out_fast (np.ndarray): Preallocated float64 output array for the `n_fast` SMA.
+        out_slow (np.ndarray): Preallocated float64 output array for the `n_slow` SMA.
+    """
+    total_fast = 0.0
+    total_slow = 0.0
+    for i in range(close.size):
+        c = close[i]
+        total_fast += c
+        total_slow += c
+        if i >= n_fast:
+            total_fast -= close[i - n_fast]
+        if i >= n_slow:
+            total_slow -= close[i - n_slow]
+        out_fast[i] = total_fast / n_fast if i >= n_fast - 1 else np.nan
+        out_slow[i] = total_slow / n_slow if i >= n_slow - 1 else np.nan
+
+@njit([f"void({_ro(t)}, int64, int64, int64, float64[:], float64[:], float64[:])" for t in _CLOSE_TYPES], cache=True)
+def rsi_sma_pair(close: np.ndarray, rsi_n: int, n_fast: int, n_slow: int,
+                 rsi_out: np.ndarray, out_fast: np.ndarray, out_slow: np.ndarray):
+    """
+    Writes the `rsi_n`-period RSI and two simple moving averages of `close` in a single
+    streaming pass: each bar updates the Wilder gain/loss sums and both rolling sums
+    (as in `sma_pair`), so `close` is only read once for all three outputs.
+
+    The RSI matches pandas_ta's default: gains and losses are smoothed with Wilder's
+    alpha = 1/rsi_n as `ewm(alpha=1/rsi_n, adjust=True)`, and the first value is at index rsi_n.
+
+    Args:
+        close (np.ndarray): 1-D float32 or float64 array of close prices.
+        rsi_n (int): The RSI period.
+        n_fast (int): The shorter SMA window length.
+        n_slow (int): The longer SMA window length.
+        rsi_out (np.ndarray): Preallocated float64 output array for the RSI.
+        out_fast (np.ndarray): Preallocated float64 output array for the `n_fast` SMA.
+        out_slow (np.ndarray): Preallocated float64 output array for the `n_slow` SMA.
+    """
+    decay = 1.0 - 1.0 / rsi_n
+    gain_sum = 0.0
+    loss_sum = 0.0
+    weight_sum = 0.0
+    total_fast = 0.0
+    total_slow = 0.0
+    for i in range(close.size):
+        c = close[i]
+
+        # --- RSI ---
+        rsi_out[i] = np.nan
+        if i > 0:
+            diff = c - close[i - 1]
+            gain_sum = (diff if diff > 0.0 else 0.0) + decay * gain_sum
+            loss_sum = (-diff if diff < 0.0 else 0.0) + decay * loss_sum
+            weight_sum = 1.0 + decay * weight_sum
+            if i >= rsi_n:
+                avg_gain = gain_sum / weight_sum
+                avg_loss = loss_sum / weight_sum
+                if avg_gain + avg_loss != 0.0:
+                    rsi_out[i] = 100.0 * avg_gain / (avg_gain + avg_loss)
+
+        # --- SMAs ---
+        total_fast += c
+        total_slow += c
+        if i >= n_fast:
+            total_fast -= close[i - n_fast]
+        if i >= n_slow:
+            total_slow -= close[i - n_slow]
+        out_fast[i] = total_fast / n_fast if i >= n_fast - 1 else np.nan
+        out_slow[i] = total_slow / n_slow if i >= n_slow - 1 else np.nan
+
+# Parallel kernels are compiled lazily on first use: compiling one eagerly at import would start
+# numba's threading layer in every process importing this module, and a process pool forked from
+# such a parent hangs at interpreter exit
+@njit(parallel=True, cache=True)
+def rsi_sma_pair_2d(close: np.ndarray, rsi_n: int, n_fast: int, n_slow: int,
+                    rsi_out: np.ndarray, out_fast: np.ndarray, out_slow: np.ndarray):
+    """
+    Column-wise `rsi_sma_pair` over a (T, N) close matrix with one symbol per column,
+    running the symbols in parallel.
+
+    Args:
+        close (np.ndarray): 2-D array of close prices, ideally Fortran-ordered
+                            so each column is contiguous.
+        rsi_n, n_fast, n_slow (int): The RSI period and the two SMA window lengths.
+        rsi_out, out_fast, out_slow (np.ndarray): Preallocated float64 output arrays
+                                                  of the same shape as `close`.
+    """
+    for j in prange(close.shape[1]):
+        rsi_sma_pair(close[:, j], rsi_n, n_fast, n_slow, rsi_out[:, j], out_fast[:, j], out_slow[:, j])
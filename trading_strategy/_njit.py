@@ -0,0 +1,17 @@
+# trading_strategy/_njit.py
+
+try:
+    from numba import njit, prange
+except ImportError: # Fall back to plain Python so the kernels still run without numba
+    prange = range
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+def readonly_array(dtype: str, ndim: int = 1) -> str:
+    """
+    Returns the numba signature string for a read-only input array of any layout
+    (pandas hands out read-only views under copy-on-write; writable arrays are accepted too).
+    """
+    return f"Array({dtype}, {ndim}, 'A', readonly=True)"
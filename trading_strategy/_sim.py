@@ -0,0 +1,114 @@
+# trading_strategy/_sim.py
+
+import numpy as np
+from ._njit import njit, prange, readonly_array as _ro
+
+# Exit reasons returned by simulate_trades
+EXIT_TARGET = 0 # Profit target hit
+EXIT_STOP = 1 # Stop loss hit
+EXIT_FORCED = 2 # Still open at the end of the data, closed at the last close
+
+# An explicit signature compiles the serial kernel eagerly at import time (see _kernels.py)
+@njit("Tuple((int64[:], int64[:], float64[:], float64[:], int8[:]))"
+      f"({', '.join([_ro('float64')] * 7)})", cache=True)
+def simulate_trades(open_, high, low, close, rsi, dma20, dma50):
+    """
+    Runs the RSI + moving-average crossover position state machine over the price arrays.
+
+    - BUY at the open when flat, RSI < 30 and the 20-DMA crosses above the 50-DMA.
+    - SELL at a 5% profit target (checked first) or a 2% stop loss, from the buy day on.
+    - Any position still open at the end is closed at the last close.
+    Days with a NaN indicator are skipped entirely.
+
+    Args:
+        open_, high, low, close (np.ndarray): 1-D float64 price arrays.
+        rsi, dma20, dma50 (np.ndarray): 1-D float64 indicator arrays of the same length.
+
+    Returns:
+        tuple[np.ndarray, ...]: (buy_idx, sell_idx, sell_price, pnl, exit_reason), one entry
+                                per trade in order; exit_reason is one of the EXIT_* codes.
+    """
+    n = close.size
+    # Every trade needs its own buy day, so n slots are always enough
+    buy_idx = np.empty(n, np.int64)
+    sell_idx = np.empty(n, np.int64)
+    sell_price = np.empty(n, np.float64)
+    pnl = np.empty(n, np.float64)
+    exit_reason = np.empty(n, np.int8)
+
+    k = 0 # Number of trades recorded
+    in_position = False
+    buy_price = 0.0
+    for i in range(1, n):
+        if np.isnan(rsi[i]) or np.isnan(dma20[i]) or np.isnan(dma50[i]):
+            continue
+
+        # --- BUY Logic ---
+        if (not in_position and rsi[i] < 30
+                and dma20[i - 1] <= dma50[i - 1] and dma20[i] > dma50[i]):
+            in_position = True
+            buy_price = open_[i]
+            buy_idx[k] = i
+
+        # --- SELL/Close Position Logic ---
+        if in_position:
+            profit_target_price = buy_price * 1.05
+            stop_loss_price = buy_price * 0.98
+            if high[i] >= profit_target_price:
+                sell_price[k] = profit_target_price
+                exit_reason[k] = EXIT_TARGET
+            elif low[i] <= stop_loss_price:
+                sell_price[k] = stop_loss_price
+                exit_reason[k] = EXIT_STOP
+            else:
+                continue
+            sell_idx[k] = i
+            pnl[k] = sell_price[k] - buy_price
+            k += 1
+            in_position = False
+
+    if in_position:
+        sell_idx[k] = n - 1
+        sell_price[k] = close[n - 1]
+        pnl[k] = close[n - 1] - buy_price
+        exit_reason[k] = EXIT_FORCED
+        k += 1
+
+    return buy_idx[:k], sell_idx[:k], sell_price[:k], pnl[:k], exit_reason[:k]
+
+# Compiled lazily on first use, like the other parallel kernels (see _kernels.rsi_sma_pair_2d)
+@njit(parallel=True, cache=True)
+def simulate_trades_2d(open_, high, low, close, rsi, dma20, dma50):
+    """
+    Runs `simulate_trades` for every column of (T, N) price/indicator matrices,
+    one symbol per column, with the symbols in parallel.
+
+    Args:
+        open_, high, low, close (np.ndarray): 2-D float64 price arrays of shape (T, N).
+        rsi, dma20, dma50 (np.ndarray): 2-D float64 indicator arrays of the same shape.
+
+    Returns:
+        tuple[np.ndarray, ...]: (buy_idx, sell_idx, sell_price, pnl, exit_reason, n_trades).
+                                The first five have shape (T, N); column j holds symbol j's
+                                trades in rows [0, n_trades[j]).
+    """
+    t, n = close.shape
+    buy_idx = np.empty((t, n), np.int64)
+    sell_idx = np.empty((t, n), np.int64)
+    sell_price = np.empty((t, n), np.float64)
+    pnl = np.empty((t, n), np.float64)
+    exit_reason = np.empty((t, n), np.int8)
+    n_trades = np.zeros(n, np.int64)
+
+    for j in prange(n):
+        b, s, p, q, r = simulate_trades(open_[:, j], high[:, j], low[:, j], close[:, j],
+                                        rsi[:, j], dma20[:, j], dma50[:, j])
+        k = b.size
+        n_trades[j] = k
+        buy_idx[:k, j] = b
+        sell_idx[:k, j] = s
+        sell_price[:k, j] = p
+        pnl[:k, j] = q
+        exit_reason[:k, j] = r
+
+    return buy_idx, sell_idx, sell_price, pnl, exit_reason, n_trades
@@ -1,8 +1,10 @@
 # trading_strategy/backtester.py
 
+import numpy as np
 import pandas as pd
 import logging
 from .indicators import add_indicators
+from ._sim import simulate_trades, EXIT_TARGET, EXIT_STOP, EXIT_FORCED
 
 logger = logging.getLogger(__name__)
 
@@ -10,7 +12,7 @@ class Backtester:
     """
     Simulates a trading strategy on historical data for a given stock.
     """
-    def __init__(self, symbol: str, data: pd.DataFrame):
+    def __init__(self, symbol: str, data: pd.DataFrame, use_test_strategy: bool = True):
         """
         Initializes the Backtester with stock data and calculates indicators.
 
@@ -18,141 +20,130 @@ class Backtester:
             symbol (str): The stock symbol being backtested.
             data (pd.DataFrame): DataFrame containing historical stock data
                                  (must have 'open', 'high', 'low', 'close', 'volume').
+            use_test_strategy (bool): If True (default), run the simplified buy-first-day /
+                                      sell-last-day test strategy. If False, run the
+                                      RSI + moving-average crossover strategy.
         """
         self.symbol = symbol
-        self.data = add_indicators(data.copy()) # Add indicators to a copy of the data
+        self.use_test_strategy = use_test_strategy
+        self.data = add_indicators(data) # Returns a new frame; the caller's data is left untouched
         
-        # Drop rows with NaN values that result from indicator calculations
-        self.data.dropna(subset=['rsi', '20_dma', '50_dma'], inplace=True)
+        # Drop rows with NaN values that result from indicator calculations.
+        # The NaNs are normally just the leading warm-up rows (49 for the 50-DMA),
+        # so the mask is built on the raw arrays and the frame is only sliced.
+        valid = ~(np.isnan(self.data['rsi'].to_numpy()) | np.isnan(self.data['20_dma'].to_numpy())
+                  | np.isnan(self.data['50_dma'].to_numpy()))
+        first_valid = int(valid.argmax()) if valid.any() else len(valid)
+        if valid[first_valid:].all():
+            self.data = self.data.iloc[first_valid:]
+        else:
+            self.data = self.data.iloc[np.flatnonzero(valid)]
+        # Format every date once (vectorized) so trades can look their dates up by row position
+        self._date_strs = self.data.index.strftime('%Y-%m-%d').to_numpy()
         
-        self.trades = [] # List to store details of each trade
+        # Trade log in columnar form, one entry per trade (see _record_trades)
+        self._buy_idx = np.empty(0, dtype=np.int64) # Row position of each buy day
+        self._sell_idx = np.empty(0, dtype=np.int64) # Row position of each sell day
+        self._buy_prices = np.empty(0)
+        self._sell_prices = np.empty(0)
+        self._pnls = np.empty(0)
+        self._statuses = np.empty(0, dtype=object)
         self.pnl = 0.0 # Total Profit and Loss
         self.win_count = 0 # Number of winning trades
         self.loss_count = 0 # Number of losing trades
-        self.current_position = None # Tracks if there's an open position (None or dict)
         
         if self.data.empty:
             logger.warning(f"Backtester initialized with empty or insufficient data for {self.symbol}.")
 
     def run_strategy(self):
         """
-        Runs a simplified backtesting strategy for testing purposes.
-        This strategy buys on the first day and sells on the last day
-        to ensure that trades are always recorded.
+        Runs the selected backtesting strategy (see `use_test_strategy`).
         """
         if self.data.empty:
             logger.warning(f"Cannot run strategy for {self.symbol}: No valid data.")
             return
 
         logger.info(f"Running backtest for {self.symbol} with {len(self.data)} data points...")
-        
+
+        if self.use_test_strategy:
+            self._run_test_strategy()
+        else:
+            self._run_rsi_ma_strategy()
+
+    def _run_test_strategy(self):
+        """
+        Runs a simplified backtesting strategy for testing purposes.
+        This strategy buys on the first day and sells on the last day
+        to ensure that trades are always recorded.
+        """
         # --- SIMPLIFIED BUY/SELL LOGIC for TESTING ---
         
-        # Get the first and last day of the backtesting data
-        first_day = self.data.iloc[0]
-        last_day = self.data.iloc[-1]
+        # Read the two prices straight from the column arrays rather than
+        # materialising whole rows with iloc
+        opens = self.data['open'].to_numpy()
+        closes = self.data['close'].to_numpy()
+        buy_date = self._date_strs[0]
+        sell_date = self._date_strs[-1]
         
         # Assume we 'buy' on the open of the first day
-        buy_price = first_day['open']
+        buy_price = float(opens[0])
         
         # Assume we 'sell' on the close of the last day
-        sell_price = last_day['close']
+        sell_price = float(closes[-1])
         
         # Calculate P&L for this single trade
         pnl_trade = sell_price - buy_price
 
         # Log the single trade
-        self.trades.append({
-            'symbol': self.symbol,
-            'buy_date': first_day.name.strftime('%Y-%m-%d'),
-            'buy_price': buy_price,
-            'sell_date': last_day.name.strftime('%Y-%m-%d'),
-            'sell_price': sell_price,
-            'pnl': pnl_trade,
-            'status': 'Closed (Test Trade)'
-        })
-
-        self.pnl = pnl_trade
-        self.win_count = 1 if pnl_trade > 0 else 0
-        self.loss_count = 1 if pnl_trade <= 0 else 0
+        self._record_trades(np.array([0]), np.array([len(opens) - 1]), np.array([buy_price]),
+                            np.array([sell_price]), np.array([pnl_trade]),
+                            np.array(['Closed (Test Trade)'], dtype=object))
         
-        logger.info(f"SIMULATED TRADE for {self.symbol}: Bought at {buy_price:.2f} on {first_day.name.strftime('%Y-%m-%d')} and sold at {sell_price:.2f} on {last_day.name.strftime('%Y-%m-%d')}. P&L: {pnl_trade:.2f}")
-
-        # =======================================================================================
-        # Original Assignment Logic (Commented out):
-        # You can uncomment this block and remove the test logic above to run the actual strategy.
-        # =======================================================================================
-
-        # for i in range(1, len(self.data)):
-        #     current_day = self.data.iloc[i]
-        #     prev_day = self.data.iloc[i-1]
-            
-        #     if pd.isna(current_day['rsi']) or pd.isna(current_day['20_dma']) or pd.isna(current_day['50_dma']):
-        #         continue
-
-        #     # --- BUY Logic ---
-        #     # Condition 1: RSI < 30
-        #     rsi_buy_condition = current_day['rsi'] < 30
-        #     # Condition 2: 20-DMA crosses above 50-DMA
-        #     ma_cross_buy_condition = (prev_day['20_dma'] <= prev_day['50_dma']) and \
-        #                              (current_day['20_dma'] > current_day['50_dma'])
-            
-        #     if rsi_buy_condition and ma_cross_buy_condition and self.current_position is None:
-        #         buy_price = current_day['open']
-        #         self.current_position = {
-        #             'symbol': self.symbol,
-        #             'buy_date': current_day.name.strftime('%Y-%m-%d'),
-        #             'buy_price': buy_price,
-        #             'status': 'Open'
-        #         }
-        #         logger.info(f"BUY Signal on {self.symbol} at {buy_price:.2f} on {current_day.name.strftime('%Y-%m-%d')}")
-
-        #     # --- SELL/Close Position Logic ---
-        #     if self.current_position and self.current_position['status'] == 'Open':
-        #         buy_price = self.current_position['buy_price']
-        #         profit_target_price = buy_price * 1.05
-        #         stop_loss_price = buy_price * 0.98
-        #         sell_price = None
-        #         pnl_trade = 0.0
-
-        #         if current_day['high'] >= profit_target_price:
-        #             sell_price = profit_target_price
-        #             pnl_trade = sell_price - buy_price
-        #             logger.info(f"PROFIT TARGET HIT for {self.symbol}. Selling at {sell_price:.2f} on {current_day.name.strftime('%Y-%m-%d')}")
-        #         elif current_day['low'] <= stop_loss_price:
-        #             sell_price = stop_loss_price
-        #             pnl_trade = sell_price - buy_price
-        #             logger.info(f"STOP LOSS HIT for {self.symbol}. Selling at {sell_price:.2f} on {current_day.name.strftime('%Y-%m-%d')}")
-
-        #         if sell_price is not None:
-        #             self.pnl += pnl_trade
-        #             self.current_position.update({
-        #                 'sell_date': current_day.name.strftime('%Y-%m-%d'),
-        #                 'sell_price': sell_price,
-        #                 'pnl': pnl_trade,
-        #                 'status': 'Closed'
-        #             })
-        #             self.trades.append(self.current_position)
-        #             if pnl_trade > 0: self.win_count += 1
-        #             else: self.loss_count += 1
-        #             self.current_position = None
-
-        # if self.current_position and self.current_position['status'] == 'Open':
-        #     last_day = self.data.iloc[-1]
-        #     sell_price = last_day['close']
-        #     pnl_trade = sell_price - self.current_position['buy_price']
-        #     self.pnl += pnl_trade
-        #     self.current_position.update({
-        #         'sell_date': last_day.name.strftime('%Y-%m-%d'),
-        #         'sell_price': sell_price,
-        #         'pnl': pnl_trade,
-        #         'status': 'Closed (Forced Exit)'
-        #     })
-        #     self.trades.append(self.current_position)
-        #     if pnl_trade > 0: self.win_count += 1
-        #     else: self.loss_count += 1
-        #     logger.info(f"Forced Exit for {self.symbol} at end of backtest. Selling at {sell_price:.2f} on {last_day.name.strftime('%Y-%m-%d')}. P&L: {pnl_trade:.2f}")
+        logger.info(f"SIMULATED TRADE for {self.symbol}: Bought at {buy_price:.2f} on {buy_date} and sold at {sell_price:.2f} on {sell_date}. P&L: {pnl_trade:.2f}")
+
+    def _run_rsi_ma_strategy(self):
+        """
+        Runs the original assignment strategy:
+        - BUY at the open when RSI < 30 and the 20-DMA crosses above the 50-DMA.
+        - SELL at a 5% profit target (checked first) or a 2% stop loss, from the buy day on.
+        - Any position still open at the end is closed at the last close.
 
+        The sequential position logic runs in the jitted `simulate_trades` kernel over
+        flat NumPy arrays; Python only loops once per trade to log it.
+        """
+        columns = [self.data[col].to_numpy(dtype=np.float64)
+                   for col in ('open', 'high', 'low', 'close', 'rsi', '20_dma', '50_dma')]
+        buy_idx, sell_idx, sell_prices, pnls, exit_reasons = simulate_trades(*columns)
+        buy_prices = columns[0][buy_idx]
+        dates = self._date_strs
+
+        # Per-trade messages are only built when INFO is actually being logged
+        if logger.isEnabledFor(logging.INFO):
+            for b, s, buy_price, sell_price, pnl_trade, reason in zip(buy_idx, sell_idx, buy_prices, sell_prices, pnls, exit_reasons):
+                logger.info("BUY Signal on %s at %.2f on %s", self.symbol, buy_price, dates[b])
+                if reason == EXIT_TARGET:
+                    logger.info("PROFIT TARGET HIT for %s. Selling at %.2f on %s", self.symbol, sell_price, dates[s])
+                elif reason == EXIT_STOP:
+                    logger.info("STOP LOSS HIT for %s. Selling at %.2f on %s", self.symbol, sell_price, dates[s])
+                else:
+                    logger.info("Forced Exit for %s at end of backtest. Selling at %.2f on %s. P&L: %.2f",
+                                self.symbol, sell_price, dates[s], pnl_trade)
+
+        statuses = np.where(exit_reasons == EXIT_FORCED, 'Closed (Forced Exit)', 'Closed').astype(object)
+        self._record_trades(buy_idx, sell_idx, buy_prices, sell_prices, pnls, statuses)
+
+    def _record_trades(self, buy_idx: np.ndarray, sell_idx: np.ndarray, buy_prices: np.ndarray,
+                       sell_prices: np.ndarray, pnls: np.ndarray, statuses: np.ndarray):
+        """
+        Stores the trade log as parallel arrays (one entry per trade) and updates the
+        P&L and win/loss counts from them.
+        """
+        self._buy_idx, self._sell_idx = buy_idx, sell_idx
+        self._buy_prices, self._sell_prices, self._pnls = buy_prices, sell_prices, pnls
+        self._statuses = statuses
+        self.pnl = float(pnls.sum())
+        self.win_count = int(np.count_nonzero(pnls > 0))
+        self.loss_count = len(pnls) - self.win_count
 
     def get_results(self) -> dict:
         """
@@ -161,13 +152,21 @@ class Backtester:
         Returns:
             dict: A dictionary containing backtesting metrics.
         """
-        total_trades = len(self.trades)
+        total_trades = len(self._pnls)
         win_ratio = (self.win_count / total_trades) * 100 if total_trades > 0 else 0.0
         
-        trade_log_df = pd.DataFrame(self.trades)
+        # Built once from the columnar trade log, so no per-trade dicts or dtype inference
+        trade_log_df = pd.DataFrame({
+            'symbol': np.full(total_trades, self.symbol, dtype=object),
+            'buy_date': self._date_strs[self._buy_idx],
+            'buy_price': self._buy_prices,
+            'sell_date': self._date_strs[self._sell_idx],
+            'sell_price': self._sell_prices,
+            'pnl': self._pnls,
+            'status': self._statuses
+        })
         if trade_log_df.empty:
             logger.info(f"No trades recorded for {self.symbol}.")
-            trade_log_df = pd.DataFrame(columns=['symbol', 'buy_date', 'buy_price', 'sell_date', 'sell_price', 'pnl', 'status'])
 
         return {
             'symbol': self.symbol,
@@ -1,101 +1,160 @@
 # trading_strategy/data_fetcher.py
 
+import numpy as np
 import pandas as pd
-import requests
+import os
 import time
 from datetime import date, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
 
-def fetch_daily_data(symbol: str, api_key: str) -> pd.DataFrame | None:
+ALPHA_VANTAGE_URL = "https://www.alphavantage.co/query"
+
+# Alpha Vantage's free tier allows 5 requests per minute
+REQUESTS_PER_MINUTE = 5
+
+# Alpha Vantage's per-minute rate-limit "Note" is retried with exponential backoff:
+# waits of 15s, 30s, 60s and 120s, then the symbol is given up.
+MAX_RATE_LIMIT_RETRIES = 4
+RATE_LIMIT_BACKOFF_SECONDS = 15
+
+# HTTP-level 429/5xx responses are retried separately, with waits of 1s, 2s and 4s.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_HTTP_RETRIES = 3
+HTTP_BACKOFF_SECONDS = 1.0
+
+def rate_limit_delay(attempt: int) -> float:
+    """
+    Returns how long to wait before retrying after the given (0-based) rate-limited attempt.
     """
-    Fetches daily stock data for a given symbol from Alpha Vantage.
+    return RATE_LIMIT_BACKOFF_SECONDS * 2 ** attempt
 
-    Args:
-        symbol (str): The stock symbol (e.g., "RELIANCE.BSE").
-        api_key (str): Your Alpha Vantage API key.
+def http_retry_delay(attempt: int) -> float:
+    """
+    Returns how long to wait before retrying after the given (0-based) 429/5xx response.
+    """
+    return HTTP_BACKOFF_SECONDS * 2 ** attempt
 
-    Returns:
-        pd.DataFrame | None: A DataFrame containing daily stock data (open, high, low, close, volume)
-                             with a DatetimeIndex, or None if an error occurs.
+# Parsed daily data is cached on disk per symbol so re-runs skip the API and JSON parsing.
+# Daily bars only change once a day, so a cached file is reused for up to 12 hours.
+PRICE_CACHE_DIR = ".cache/prices"
+PRICE_CACHE_MAX_AGE_SECONDS = 12 * 60 * 60
+
+def build_daily_params(symbol: str, api_key: str) -> dict:
+    """
+    Returns the Alpha Vantage query parameters for a symbol's full daily history.
     """
-    logger.info(f"Attempting to fetch data for {symbol}...")
-    base_url = "https://www.alphavantage.co/query"
-    params = {
+    return {
         "function": "TIME_SERIES_DAILY",
         "symbol": symbol,
         "outputsize": "full",  # 'full' for historical data, 'compact' for recent 100 days
         "apikey": api_key
     }
-    
-    try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
-        data = response.json()
-        
-        # Alpha Vantage often returns a "Note" if the API call limit is hit
-        if "Note" in data:
-            logger.warning(f"Alpha Vantage API call limit reached for {symbol}. Waiting for 60 seconds...")
-            time.sleep(60) # Wait for 1 minute before retrying
-            return fetch_daily_data(symbol, api_key) # Recursive call to retry
-        
-        # Check if the API returned an error message
-        if "Error Message" in data:
-            logger.error(f"Alpha Vantage API error for {symbol}: {data['Error Message']}")
-            return None
 
-        time_series = data.get("Time Series (Daily)", {})
-        if not time_series:
-            logger.warning(f"No time series data found for {symbol}.")
-            return None
+def parse_daily_response(data: dict, symbol: str) -> pd.DataFrame | None:
+    """
+    Converts a decoded TIME_SERIES_DAILY response into a DataFrame.
+    Rate-limit "Note" responses must be handled by the caller before this is called.
 
-        # Convert dictionary to DataFrame
-        df = pd.DataFrame.from_dict(time_series, orient='index', dtype=float)
-        df.columns = ['open', 'high', 'low', 'close', 'volume']
-        df.index = pd.to_datetime(df.index)
-        df = df.sort_index(ascending=True) # Ensure chronological order
+    Args:
+        data (dict): The decoded JSON response.
+        symbol (str): The stock symbol the response belongs to.
 
-        logger.info(f"Successfully fetched {len(df)} data points for {symbol}.")
-        return df
-    
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Network or API request error for {symbol}: {e}")
+    Returns:
+        pd.DataFrame | None: A DataFrame of float64 prices and integer volumes with a DatetimeIndex,
+                             or None if the response contains no usable data.
+    """
+    # Check if the API returned an error message
+    if "Error Message" in data:
+        logger.error(f"Alpha Vantage API error for {symbol}: {data['Error Message']}")
         return None
-    except ValueError as e: # Catches JSON decoding errors
-        logger.error(f"Error decoding JSON response for {symbol}: {e}. Response: {response.text[:200]}...")
+
+    time_series = data.get("Time Series (Daily)", {})
+    if not time_series:
+        logger.warning(f"No time series data found for {symbol}.")
+        return None
+
+    # Pull the dates and each field's strings out in one pass over the dict,
+    # then let NumPy parse each column in bulk instead of building a frame from a dict of dicts
+    dates, *fields = zip(*((day, bar['1. open'], bar['2. high'], bar['3. low'], bar['4. close'], bar['5. volume'])
+                           for day, bar in time_series.items()))
+    # Prices stay float64 so the trade log and P&L keep the source's decimals;
+    # the four price columns share one contiguous block.
+    # Float32 copies are made only where the indicator kernels consume them.
+    prices = np.column_stack([np.array(field, dtype=np.float64) for field in fields[:4]])
+    # Volumes are whole share counts: int32 is exact where float32 is not, falling back to int64 on overflow
+    volume = np.array(fields[4], dtype=np.int64)
+    if volume.max() <= np.iinfo(np.int32).max:
+        volume = volume.astype(np.int32)
+    index = pd.to_datetime(dates, format='%Y-%m-%d', cache=True)
+    df = pd.DataFrame(prices, index=index, columns=['open', 'high', 'low', 'close'])
+    df['volume'] = volume
+    df = df.sort_index(ascending=True) # Ensure chronological order
+
+    logger.info(f"Successfully fetched {len(df)} data points for {symbol}.")
+    return df
+
+def _price_cache_path(symbol: str) -> str:
+    return os.path.join(PRICE_CACHE_DIR, f"{symbol}.parquet")
+
+def load_cached_daily_data(symbol: str) -> pd.DataFrame | None:
+    """
+    Loads a symbol's daily data from the on-disk Parquet cache.
+
+    Args:
+        symbol (str): The stock symbol.
+
+    Returns:
+        pd.DataFrame | None: The cached DataFrame, or None if there is no cache entry
+                             or it is older than PRICE_CACHE_MAX_AGE_SECONDS.
+    """
+    path = _price_cache_path(symbol)
+    try:
+        if time.time() - os.path.getmtime(path) > PRICE_CACHE_MAX_AGE_SECONDS:
+            return None
+        df = pd.read_parquet(path)
+    except FileNotFoundError:
         return None
     except Exception as e:
-        logger.error(f"An unexpected error occurred while fetching data for {symbol}: {e}")
+        logger.warning(f"Could not read cached data for {symbol}: {e}. Fetching from the API instead.")
         return None
+    logger.info(f"Loaded {len(df)} cached data points for {symbol}.")
+    return df
+
+def save_cached_daily_data(symbol: str, df: pd.DataFrame):
+    """
+    Writes a symbol's daily data to the on-disk Parquet cache. Failures are logged, not raised.
+
+    Args:
+        symbol (str): The stock symbol.
+        df (pd.DataFrame): The parsed daily data.
+    """
+    try:
+        os.makedirs(PRICE_CACHE_DIR, exist_ok=True)
+        df.to_parquet(_price_cache_path(symbol))
+    except Exception as e:
+        logger.warning(f"Could not cache data for {symbol}: {e}")
 
-def get_all_stock_data(api_key: str, stock_symbols: list[str]) -> dict[str, pd.DataFrame]:
+def filter_last_six_months(df: pd.DataFrame, symbol: str) -> pd.DataFrame | None:
     """
-    Fetches daily data for a list of stock symbols.
-    Filters the data to the last 6 months for backtesting.
+    Filters a symbol's daily data to the last 6 months for backtesting.
 
     Args:
-        api_key (str): The Alpha Vantage API key.
-        stock_symbols (list[str]): A list of stock symbols.
+        df (pd.DataFrame): Daily data with an ascending DatetimeIndex.
+        symbol (str): The stock symbol, used for logging.
 
     Returns:
-        dict[str, pd.DataFrame]: A dictionary where keys are stock symbols
-                                 and values are DataFrames of their daily data.
+        pd.DataFrame | None: The filtered DataFrame, or None if nothing remains.
     """
-    all_data = {}
-    for symbol in stock_symbols:
-        df = fetch_daily_data(symbol, api_key)
-        if df is not None and not df.empty:
-            # Filter data for the last 6 months
-            six_months_ago = date.today() - timedelta(days=180)
-            # Use .loc for label-based indexing to filter dates
-            df_filtered = df.loc[df.index >= pd.Timestamp(six_months_ago)]
-            
-            if df_filtered.empty:
-                logger.warning(f"No data available for {symbol} in the last 6 months after filtering.")
-            else:
-                all_data[symbol] = df_filtered
-                logger.info(f"Filtered {symbol} data to {len(df_filtered)} entries for the last 6 months.")
-        else:
-            logger.warning(f"Skipping {symbol} due to failed data fetch or empty DataFrame.")
-    return all_data
\ No newline at end of file
+    six_months_ago = date.today() - timedelta(days=180)
+    # The index is sorted ascending, so binary-search the cutoff and slice
+    # instead of building a boolean mask over every row
+    start = df.index.searchsorted(pd.Timestamp(six_months_ago))
+    df_filtered = df.iloc[start:]
+    
+    if df_filtered.empty:
+        logger.warning(f"No data available for {symbol} in the last 6 months after filtering.")
+        return None
+    logger.info(f"Filtered {symbol} data to {len(df_filtered)} entries for the last 6 months.")
+    return df_filtered
@@ -0,0 +1,139 @@
+# trading_strategy/data_fetcher_async.py
+
+import pandas as pd
+import httpx
+import orjson
+import asyncio
+import time
+from collections import deque
+import logging
+from .data_fetcher import (ALPHA_VANTAGE_URL, REQUESTS_PER_MINUTE, MAX_RATE_LIMIT_RETRIES,
+                           RETRY_STATUSES, MAX_HTTP_RETRIES, build_daily_params, parse_daily_response,
+                           filter_last_six_months, rate_limit_delay, http_retry_delay,
+                           load_cached_daily_data, save_cached_daily_data)
+
+logger = logging.getLogger(__name__)
+
+class RequestRateLimiter:
+    """
+    Lets at most `max_requests` requests start in any sliding window of `period` seconds.
+    Callers that would exceed the limit wait, in arrival order, until the oldest request
+    in the window ages out.
+    """
+    def __init__(self, max_requests: int, period: float = 60.0):
+        self.max_requests = max_requests
+        self.period = period
+        self._starts = deque() # Monotonic start times of the requests in the current window
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        Waits until another request may start, then records it.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._starts and now - self._starts[0] >= self.period:
+                    self._starts.popleft()
+                if len(self._starts) < self.max_requests:
+                    self._starts.append(now)
+                    return
+                await asyncio.sleep(self._starts[0] + self.period - now)
+
+async def fetch_one(client: httpx.AsyncClient, limiter: RequestRateLimiter, symbol: str, api_key: str) -> pd.DataFrame | None:
+    """
+    Fetches daily stock data for a given symbol from Alpha Vantage without blocking
+    the other symbols' requests.
+
+    Args:
+        client (httpx.AsyncClient): The shared HTTP client.
+        limiter (RequestRateLimiter): Caps how many requests start per minute.
+        symbol (str): The stock symbol (e.g., "RELIANCE.BSE").
+        api_key (str): Your Alpha Vantage API key.
+
+    Returns:
+        pd.DataFrame | None: A DataFrame containing daily stock data, or None if an error occurs.
+    """
+    cached = load_cached_daily_data(symbol)
+    if cached is not None:
+        return cached
+
+    logger.info(f"Attempting to fetch data for {symbol}...")
+    params = build_daily_params(symbol, api_key)
+
+    rate_limit_retries = 0
+    http_retries = 0
+    try:
+        while True:
+            await limiter.acquire()
+            response = await client.get(ALPHA_VANTAGE_URL, params=params)
+
+            # Transient 429/5xx responses get their own, shorter backoff before giving up
+            if response.status_code in RETRY_STATUSES and http_retries < MAX_HTTP_RETRIES:
+                delay = http_retry_delay(http_retries)
+                http_retries += 1
+                logger.warning(f"HTTP {response.status_code} for {symbol}. Retrying in {delay} seconds...")
+                await asyncio.sleep(delay)
+                continue
+
+            response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
+            data = orjson.loads(response.content)
+
+            # Alpha Vantage often returns a "Note" if the API call limit is hit
+            if "Note" not in data:
+                df = parse_daily_response(data, symbol)
+                if df is not None:
+                    save_cached_daily_data(symbol, df)
+                return df
+
+            if rate_limit_retries == MAX_RATE_LIMIT_RETRIES:
+                logger.error(f"Alpha Vantage API call limit still reached for {symbol} after {MAX_RATE_LIMIT_RETRIES} retries. Giving up.")
+                return None
+
+            delay = rate_limit_delay(rate_limit_retries)
+            rate_limit_retries += 1
+            logger.warning(f"Alpha Vantage API call limit reached for {symbol}. Waiting for {delay} seconds...")
+            await asyncio.sleep(delay) # Other symbols keep going while this one waits
+
+    except httpx.HTTPError as e:
+        logger.error(f"Network or API request error for {symbol}: {e}")
+        return None
+    except ValueError as e: # Catches JSON decoding errors
+        logger.error(f"Error decoding JSON response for {symbol}: {e}. Response: {response.text[:200]}...")
+        return None
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while fetching data for {symbol}: {e}")
+        return None
+
+async def _fetch_all(api_key: str, stock_symbols: list[str]) -> list[pd.DataFrame | None]:
+    limiter = RequestRateLimiter(REQUESTS_PER_MINUTE)
+    # Connection failures are retried by the transport; 429/5xx responses by fetch_one
+    transport = httpx.AsyncHTTPTransport(http2=True, retries=MAX_HTTP_RETRIES)
+    async with httpx.AsyncClient(transport=transport, timeout=30.0) as client:
+        return await asyncio.gather(*(fetch_one(client, limiter, symbol, api_key) for symbol in stock_symbols))
+
+def get_all_stock_data(api_key: str, stock_symbols: list[str]) -> dict[str, pd.DataFrame]:
+    """
+    Fetches daily data for a list of stock symbols concurrently over one HTTP/2 client.
+    Filters the data to the last 6 months for backtesting.
+
+    Args:
+        api_key (str): The Alpha Vantage API key.
+        stock_symbols (list[str]): A list of stock symbols.
+
+    Returns:
+        dict[str, pd.DataFrame]: A dictionary where keys are stock symbols
+                                 and values are DataFrames of their daily data.
+    """
+    frames = asyncio.run(_fetch_all(api_key, stock_symbols))
+
+    all_data = {}
+    for symbol, df in zip(stock_symbols, frames):
+        if df is not None and not df.empty:
+            # Filter data for the last 6 months
+            df_filtered = filter_last_six_months(df, symbol)
+            if df_filtered is not None:
+                all_data[symbol] = df_filtered
+        else:
+            logger.warning(f"Skipping {symbol} due to failed data fetch or empty DataFrame.")
+    return all_data
@@ -1,8 +1,9 @@
 # trading_strategy/indicators.py
 
+import numpy as np
 import pandas as pd
-import pandas_ta as ta # Import the pandas_ta library
 import logging
+from . import _kernels
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +16,7 @@ def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
         df (pd.DataFrame): DataFrame with 'close' prices and 'volume'.
 
     Returns:
-        pd.DataFrame: The original DataFrame with new columns for indicators.
+        pd.DataFrame: A new DataFrame with the indicator columns added; the input is not modified.
                       Returns an empty DataFrame if input is invalid.
     """
     if not isinstance(df, pd.DataFrame) or df.empty:
@@ -26,30 +27,30 @@ def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
         logger.error("DataFrame must contain a 'close' column for indicator calculation.")
         return pd.DataFrame()
 
-    df_copy = df.copy() # Work on a copy to avoid modifying the original DataFrame directly
-
     try:
-        # Calculate RSI (default period is 14)
-        # The result column will be named 'RSI_14' by default by pandas_ta
-        df_copy.ta.rsi(append=True)
-        
-        # Calculate 20-Day Simple Moving Average
-        # The result column will be named 'SMA_20' by default
-        df_copy.ta.sma(length=20, append=True)
-        
-        # Calculate 50-Day Simple Moving Average
-        # The result column will be named 'SMA_50' by default
-        df_copy.ta.sma(length=50, append=True)
+        # Extract the close prices once, as a contiguous float32 copy for the jitted kernels
+        # (all of them stream this one array sequentially). The kernels accumulate in float64
+        # and write float64 outputs; the frame's own prices are left at full precision.
+        close = np.ascontiguousarray(df['close'].to_numpy(dtype=np.float32))
+
+        # Calculate RSI (14-period) and the 20-Day and 50-Day Simple Moving Averages
+        # in a single pass over close.
+        # RSI is reused if the caller already computed it (e.g. via ml_model.predictor.add_ml_indicators)
+        sma_20 = np.empty_like(close, dtype=np.float64)
+        sma_50 = np.empty_like(close, dtype=np.float64)
+        if 'RSI_14' in df.columns:
+            rsi = df['RSI_14'].to_numpy(dtype=np.float64)
+            df = df.drop(columns='RSI_14')
+            _kernels.sma_pair(close, 20, 50, sma_20, sma_50)
+        else:
+            rsi = np.empty_like(close, dtype=np.float64)
+            _kernels.rsi_sma_pair(close, 14, 20, 50, rsi, sma_20, sma_50)
         
-        # Rename columns for easier access and consistency
-        df_copy.rename(columns={
-            'RSI_14': 'rsi',
-            'SMA_20': '20_dma',
-            'SMA_50': '50_dma'
-        }, inplace=True)
+        # assign() builds the single output frame instead of copying the input up front
+        df_out = df.assign(**{'rsi': rsi, '20_dma': sma_20, '50_dma': sma_50})
         
         logger.info("RSI, 20-DMA, and 50-DMA indicators added successfully.")
-        return df_copy
+        return df_out
     
     except Exception as e:
         logger.error(f"Error adding indicators: {e}")
@@ -0,0 +1,122 @@
+# trading_strategy/multi_backtester.py
+
+import numpy as np
+import pandas as pd
+import logging
+from . import _kernels
+from ._sim import simulate_trades_2d, EXIT_FORCED
+
+logger = logging.getLogger(__name__)
+
+TRADE_LOG_COLUMNS = ['symbol', 'buy_date', 'buy_price', 'sell_date', 'sell_price', 'pnl', 'status']
+
+class MultiBacktester:
+    """
+    Backtests the RSI + moving-average crossover strategy for many symbols at once.
+
+    All symbols share one date index and are held as (T, N) matrices with one column
+    per symbol, so indicators and trade simulation each run as a single jitted call
+    parallelised over the symbol axis instead of one Backtester per symbol.
+    Results match `Backtester(symbol, data, use_test_strategy=False)` run on the same dates.
+    """
+    def __init__(self, symbols: list[str], index: pd.DatetimeIndex,
+                 open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray):
+        """
+        Initializes the MultiBacktester with aligned price matrices and calculates indicators.
+
+        Args:
+            symbols (list[str]): The stock symbols, one per column.
+            index (pd.DatetimeIndex): The T trading days shared by all symbols.
+            open_, high, low, close (np.ndarray): Price arrays of shape (T, N).
+        """
+        self.symbols = list(symbols)
+        self.index = index
+        # Fortran order keeps each symbol's column contiguous for the per-column kernels
+        self.open, self.high, self.low, self.close = (
+            np.asfortranarray(a, dtype=np.float64) for a in (open_, high, low, close))
+
+        # RSI, 20-DMA and 50-DMA for every symbol from a single pass over each close column
+        self.rsi = np.empty_like(self.close)
+        self.dma20 = np.empty_like(self.close)
+        self.dma50 = np.empty_like(self.close)
+        _kernels.rsi_sma_pair_2d(self.close, 14, 20, 50, self.rsi, self.dma20, self.dma50)
+
+        self._trades = None # Output of simulate_trades_2d, set by run_strategy()
+
+    @classmethod
+    def from_frames(cls, data: dict[str, pd.DataFrame]) -> 'MultiBacktester':
+        """
+        Builds a MultiBacktester from per-symbol OHLCV DataFrames (e.g. the output of
+        `get_all_stock_data`), keeping only the dates every symbol has data for.
+
+        Args:
+            data (dict[str, pd.DataFrame]): DataFrames keyed by symbol, each with
+                                            'open', 'high', 'low' and 'close' columns.
+
+        Returns:
+            MultiBacktester: The backtester over the common dates.
+        """
+        symbols = list(data)
+        index = None
+        for df in data.values():
+            index = df.index if index is None else index.intersection(df.index)
+        if index is None:
+            index = pd.DatetimeIndex([])
+        if symbols and len(index) < max(len(df) for df in data.values()):
+            logger.warning(f"Aligned {len(symbols)} symbols on {len(index)} common trading days; other days are ignored.")
+
+        aligned = [data[symbol].reindex(index) for symbol in symbols]
+        open_, high, low, close = (
+            np.column_stack([df[col].to_numpy(dtype=np.float64) for df in aligned]) if aligned
+            else np.empty((len(index), 0))
+            for col in ('open', 'high', 'low', 'close'))
+        return cls(symbols, index, open_, high, low, close)
+
+    def run_strategy(self):
+        """
+        Runs the RSI + moving-average crossover strategy for all symbols in one parallel pass.
+        See `Backtester._run_rsi_ma_strategy` for the rules.
+        """
+        logger.info(f"Running backtest for {len(self.symbols)} symbols over {len(self.index)} days...")
+        self._trades = simulate_trades_2d(self.open, self.high, self.low, self.close,
+                                          self.rsi, self.dma20, self.dma50)
+
+    def get_results(self) -> list[dict]:
+        """
+        Returns one result dictionary per symbol, in the same format as `Backtester.get_results`.
+
+        Returns:
+            list[dict]: Backtesting metrics for each symbol, in column order.
+        """
+        if self._trades is None:
+            self.run_strategy()
+        buy_idx, sell_idx, sell_price, pnl, exit_reason, n_trades = self._trades
+        date_strs = self.index.strftime('%Y-%m-%d').to_numpy()
+
+        results = []
+        for j, symbol in enumerate(self.symbols):
+            k = int(n_trades[j])
+            buys, sells, pnls = buy_idx[:k, j], sell_idx[:k, j], pnl[:k, j]
+            win_count = int(np.count_nonzero(pnls > 0))
+            trade_log_df = pd.DataFrame({
+                'symbol': np.full(k, symbol, dtype=object),
+                'buy_date': date_strs[buys],
+                'buy_price': self.open[buys, j],
+                'sell_date': date_strs[sells],
+                'sell_price': sell_price[:k, j],
+                'pnl': pnls,
+                'status': np.where(exit_reason[:k, j] == EXIT_FORCED, 'Closed (Forced Exit)', 'Closed').astype(object),
+            }, columns=TRADE_LOG_COLUMNS)
+            if k == 0:
+                logger.info(f"No trades recorded for {symbol}.")
+
+            results.append({
+                'symbol': symbol,
+                'pnl': float(pnls.sum()),
+                'win_ratio': (win_count / k) * 100 if k > 0 else 0.0,
+                'win_count': win_count,
+                'loss_count': k - win_count,
+                'total_trades': k,
+                'trade_log': trade_log_df
+            })
+        return results